@@ -0,0 +1,147 @@
+"""Endpoint for streaming bulk processing of NDJSON items."""
+
+import asyncio
+import json
+import logging
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from pydantic import ValidationError
+from app.api.endpoints.language_detect import LanguageDetectRequest
+from app.api.endpoints.rewrite import RewriteRequest
+from app.api.endpoints.summarize import SummarizeRequest
+from app.api.endpoints.title import TitleRequest
+from app.core.config import settings
+from app.core.keys import current_key
+from app.core.security import check_text_size
+from app.services.bulk import stream_ndjson
+from app.services.language import detect_language
+from app.services.llm_provider import generate_title, rewrite, summarize
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class NDJSONResponse(StreamingResponse):
+    """Streaming response that leaves `receive` to the request body reader.
+
+    Starlette's default streaming response listens for disconnects on ASGI
+    servers older than spec 2.4, which would consume request body messages
+    that the bulk endpoint is still reading.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send) -> None:
+        """Stream the body without a concurrent disconnect listener."""
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+async def _summarize(payload: dict) -> dict:
+    req = SummarizeRequest.model_validate(payload)
+    check_text_size(req.text)
+    return await summarize(req.text, req.length)
+
+
+async def _rewrite(payload: dict) -> dict:
+    req = RewriteRequest.model_validate(payload)
+    check_text_size(req.text)
+    return await rewrite(req.text, req.style)
+
+
+async def _title(payload: dict) -> dict:
+    req = TitleRequest.model_validate(payload)
+    check_text_size(req.text)
+    return {"title": await generate_title(req.text)}
+
+
+async def _language_detect(payload: dict) -> dict:
+    req = LanguageDetectRequest.model_validate(payload)
+    check_text_size(req.text)
+    language = await asyncio.to_thread(detect_language, req.text)
+    if language == "unknown":
+        raise HTTPException(
+            status_code=422,
+            detail="Could not determine language. Try providing more text.",
+        )
+    return {"language": language}
+
+
+OPERATIONS = {
+    "summarize": _summarize,
+    "rewrite": _rewrite,
+    "title": _title,
+    "language-detect": _language_detect,
+}
+
+
+async def process_item(index: int, line: bytes) -> dict:
+    """Run a single NDJSON item through its operation.
+
+    Args:
+        index (int): Zero-based position of the item in the input stream.
+        line (bytes): Raw JSON object with an `op` field and operation payload.
+
+    Returns:
+        dict: The item's index, id, op and either `result` or `error`.
+    """
+    record = {"index": index}
+    try:
+        payload = json.loads(line)
+        if not isinstance(payload, dict):
+            raise ValueError("Item must be a JSON object")
+        record["id"] = payload.get("id")
+        record["op"] = op = payload.get("op")
+        if op not in OPERATIONS:
+            raise ValueError(f"op must be one of: {', '.join(OPERATIONS)}")
+        policy = current_key.get()
+        if policy is not None and not policy.allows("/" + op):
+            raise HTTPException(
+                status_code=403,
+                detail="API key is not allowed to call this endpoint",
+            )
+
+        record["result"] = await OPERATIONS[op](payload)
+        record["status"] = 200
+    except ValidationError as e:
+        record.update(status=422, error=e.errors(include_url=False)[0]["msg"])
+    except ValueError as e:
+        record.update(status=422, error=str(e))
+    except HTTPException as e:
+        record.update(status=e.status_code, error=e.detail)
+    except TimeoutError:
+        record.update(status=504, error="LLM provider timeout")
+    except Exception:
+        logger.exception("Bulk item %d failed", index)
+        record.update(status=500, error="Processing failed")
+    return record
+
+
+@router.post("", response_class=NDJSONResponse)
+async def bulk_process(request: Request):
+    """Process newline-delimited JSON items and stream results as they finish.
+
+    Each input line is an object such as
+    `{"id": "a1", "op": "summarize", "text": "...", "length": "short"}`.
+    Results are emitted in completion order, one JSON object per line.
+
+    Args:
+        request (Request): Incoming request whose body is an NDJSON stream.
+
+    Returns:
+        NDJSONResponse: A stream of per-item results.
+    """
+    return NDJSONResponse(
+        stream_ndjson(
+            request.stream(),
+            process_item,
+            concurrency=settings.BULK_CONCURRENCY,
+            max_line_bytes=settings.BULK_MAX_LINE_BYTES,
+        )
+    )
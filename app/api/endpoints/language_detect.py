@@ -2,6 +2,7 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, field_validator
+from app.core.security import check_text_size
 from app.services.language import detect_language
 from langdetect.lang_detect_exception import LangDetectException
 
@@ -32,6 +33,7 @@ async def language_detect(req: LanguageDetectRequest):
     Returns:
         dict: Language code and confidence score.
     """
+    check_text_size(req.text)
     try:
         language = detect_language(req.text)
 
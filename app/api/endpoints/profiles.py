@@ -0,0 +1,30 @@
+"""Internal endpoint for dumping captured request profiles."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core import profiling
+
+router = APIRouter()
+
+
+@router.get("", response_class=PlainTextResponse)
+async def dump_profiles():
+    """Return captured stack samples in collapsed-stack (flamegraph) format.
+
+    The output can be piped straight into `flamegraph.pl` or loaded in
+    speedscope.
+
+    Returns:
+        PlainTextResponse: One `frame;frame;... count` line per stack.
+    """
+    return PlainTextResponse(profiling.folded_stacks())
+
+
+@router.get("/stages")
+async def dump_stages():
+    """Return stage timings for each captured slow or requested profile.
+
+    Returns:
+        dict: Captured profiles, oldest first.
+    """
+    return {"profiles": [profile.to_dict() for profile in profiling.captured]}
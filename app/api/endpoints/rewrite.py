@@ -2,6 +2,8 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, field_validator
+from app.core.security import check_text_size
+from app.services.incremental import rewrite_incremental
 from app.services.llm_provider import rewrite
 
 router = APIRouter()
@@ -12,6 +14,7 @@ class RewriteRequest(BaseModel):
 
     text: str
     style: str = "simple"
+    incremental: bool = False
 
     @field_validator("style")
     @classmethod
@@ -26,16 +29,24 @@ class RewriteRequest(BaseModel):
 async def rewrite_text(req: RewriteRequest):
     """Rewrite text into a different tone using LLM provider chain.
 
+    With `incremental` set, the text is rewritten paragraph by paragraph and
+    paragraphs already rewritten in an earlier request are reused.
+
     Args:
         payload (RewriteRequest): Input text and desired style.
 
     Returns:
         dict: A JSON response with rewritten text and provider info.
     """
+    check_text_size(req.text)
     try:
+        if req.incremental:
+            return await rewrite_incremental(req.text, req.style)
         return await rewrite(req.text, req.style)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        raise
     except TimeoutError:
         raise HTTPException(status_code=504, detail="LLM provider timeout")
     except Exception:
@@ -1,6 +1,7 @@
 """Endpoint for summarizing input text."""
 
 from fastapi import APIRouter, HTTPException
+from app.core.security import check_text_size
 from app.services.llm_provider import summarize
 from pydantic import BaseModel, field_validator
 
@@ -32,10 +33,13 @@ async def summarize_text(req: SummarizeRequest):
     Returns:
         dict: A JSON response with summary, provider, and fallback info.
     """
+    check_text_size(req.text)
     try:
         return await summarize(req.text, req.length)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        raise
     except TimeoutError:
         raise HTTPException(status_code=504, detail="LLM provider timeout")
     except Exception:
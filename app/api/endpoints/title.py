@@ -2,6 +2,7 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field, field_validator
+from app.core.security import check_text_size
 from app.services.llm_provider import generate_title
 
 router = APIRouter()
@@ -37,6 +38,7 @@ async def title_route(payload: TitleRequest):
     Returns:
         dict: A response with generated title and metadata.
     """
+    check_text_size(payload.text)
     try:
         title = await generate_title(payload.text)
         return TitleResponse(title=title)
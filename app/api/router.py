@@ -1,9 +1,10 @@
 """API router that aggregates all endpoint routes."""
 
 from fastapi import APIRouter, Depends
-from app.api.endpoints import language_detect, summarize, title
+from app.api.endpoints import bulk, language_detect, profiles, summarize, title
 from app.api.endpoints import rewrite
-from app.core.security import verify_internal_api_key
+from app.core.profiling import DUMP_PATH
+from app.core.security import verify_internal_api_key, verify_profile_token
 
 api_router = APIRouter(dependencies=[Depends(verify_internal_api_key)])
 
@@ -14,3 +15,10 @@ api_router.include_router(title.router, prefix="/title", tags=["Title"])
 api_router.include_router(
     language_detect.router, prefix="/language-detect", tags=["Language"]
 )
+api_router.include_router(bulk.router, prefix="/bulk", tags=["Bulk"])
+
+# Internal endpoints exposing data across tenants; gated by PROFILE_TOKEN
+# instead of per-tenant API keys.
+internal_router = APIRouter(dependencies=[Depends(verify_profile_token)])
+
+internal_router.include_router(profiles.router, prefix=DUMP_PATH, tags=["Internal"])
@@ -13,6 +13,29 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = Field(default=None)
     LLM_PROVIDER: str = Field(default="gemini")
     INTERNAL_API_KEY: str = Field(..., description="Required internal API key")
+    BULK_CONCURRENCY: int = Field(default=4, ge=1)
+    BULK_MAX_LINE_BYTES: int = Field(default=1_048_576, ge=1)
+    PROFILE_TOKEN: Optional[str] = Field(default=None)
+    PROFILE_SAMPLE_RATE: float = Field(default=0.0, ge=0.0, le=1.0)
+    PROFILE_SLOW_MS: float = Field(default=2000.0, ge=0.0)
+    PROFILE_INTERVAL_MS: float = Field(default=5.0, gt=0.0)
+    PROFILE_BUFFER_SIZE: int = Field(default=50, ge=1)
+    PROFILE_MAX_STAGES: int = Field(default=256, ge=1)
+    REWRITE_CACHE_SIZE: int = Field(default=4096, ge=1)
+    REWRITE_SEGMENT_CONCURRENCY: int = Field(default=4, ge=1)
+    LLM_MAX_RETRIES_PER_MODEL: int = Field(default=2, ge=0)
+    LLM_RETRY_BASE_DELAY: float = Field(default=0.2, ge=0.0)
+    LLM_MAX_RETRY_AFTER: float = Field(default=2.0, ge=0.0)
+    LLM_RETRY_BUDGET_RATIO: float = Field(default=0.2, ge=0.0)
+    LLM_RETRY_BUDGET_CAPACITY: float = Field(default=10.0, ge=0.0)
+    TRACE_EXPORTER: str = Field(default="none")
+    TRACE_FILE: str = Field(default="traces.jsonl")
+    TRACE_SAMPLE_RATE: float = Field(default=0.1, ge=0.0, le=1.0)
+    TRACE_SLOW_MS: float = Field(default=2000.0, ge=0.0)
+    TRACE_MAX_SPANS: int = Field(default=256, ge=1)
+    API_KEYS_FILE: Optional[str] = Field(default=None)
+    API_KEYS_RELOAD_SECONDS: float = Field(default=5.0, gt=0.0)
+    INTERNAL_API_KEY_ENABLED: bool = Field(default=True)
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,182 @@
+"""Registry of internal API keys with per-key policies and hot reload."""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+from contextvars import ContextVar
+from typing import NamedTuple, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from app.core.config import settings
+from app.services.llm import gemini, openai
+
+logger = logging.getLogger(__name__)
+
+# Chain names as used by `llm_provider`, e.g. "gemini-2.5" or "openai-4o-mini".
+KNOWN_PROVIDERS = frozenset(
+    [f"gemini-{variant}" for variant in gemini.MODEL_IDS]
+    + [f"openai-{variant}" for variant in openai.MODEL_IDS]
+)
+
+
+class KeyPolicy(BaseModel):
+    """Per-key access policy, as stored in the key registry file."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    key_sha256: str = Field(pattern=r"^[0-9a-f]{64}$")
+    allowed_endpoints: Optional[frozenset[str]] = None
+    max_text_chars: Optional[int] = Field(default=None, ge=1)
+    providers: Optional[tuple[str, ...]] = None
+    cache: bool = True
+
+    @field_validator("providers")
+    @classmethod
+    def validate_providers(cls, v: Optional[tuple[str, ...]]):
+        """Ensure every preferred provider is a known chain name."""
+        if v is None:
+            return v
+        unknown = [name for name in v if name not in KNOWN_PROVIDERS]
+        if unknown:
+            raise ValueError(
+                f"Unknown providers {unknown}; expected any of {sorted(KNOWN_PROVIDERS)}"
+            )
+        if not v:
+            raise ValueError("providers must not be empty")
+        return v
+
+    def allows(self, path: str) -> bool:
+        """Return True if this key may call the endpoint at `path`."""
+        if self.allowed_endpoints is None:
+            return True
+        prefix = "/" + path.strip("/").split("/", 1)[0]
+        return prefix in self.allowed_endpoints
+
+
+class KeyRegistryFile(BaseModel):
+    """Schema of the key registry file."""
+
+    keys: list[KeyPolicy]
+    allow_internal_api_key: bool = True
+
+
+current_key: ContextVar[Optional[KeyPolicy]] = ContextVar("current_key", default=None)
+
+
+def hash_key(key: str) -> str:
+    """Return the hex SHA-256 digest under which a key is indexed."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class _Snapshot(NamedTuple):
+    """One loaded registry version: the key index and the legacy key's policy."""
+
+    index: dict[str, KeyPolicy]
+    fallback: Optional[KeyPolicy]
+
+
+class KeyRegistry:
+    """In-memory index of key policies, keyed by key hash.
+
+    Lookups are a single dict access plus a constant-time digest comparison.
+    Reloads build a new snapshot and swap it in as one reference, so requests
+    never see a partially loaded registry and never touch the file themselves.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Create a registry, loading `path` if given.
+
+        Args:
+            path (Optional[str]): JSON file with a `keys` list of `KeyPolicy`.
+        """
+        self.path = path
+        self._mtime: Optional[int] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._default = KeyPolicy(
+            name="internal", key_sha256=hash_key(settings.INTERNAL_API_KEY)
+        )
+        self._snapshot = _Snapshot({}, self._default)
+        if path:
+            self.load()
+
+    def load(self) -> None:
+        """Read the registry file and atomically replace the index.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the file is not a valid registry.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, encoding="utf-8") as f:
+            registry = KeyRegistryFile.model_validate(json.load(f))
+        legacy_enabled = (
+            settings.INTERNAL_API_KEY_ENABLED and registry.allow_internal_api_key
+        )
+        self._snapshot = _Snapshot(
+            {policy.key_sha256: policy for policy in registry.keys},
+            self._default if legacy_enabled else None,
+        )
+        self._mtime = mtime
+        logger.info("Loaded %d API keys from %s", len(registry.keys), self.path)
+
+    def lookup(self, key: str) -> Optional[KeyPolicy]:
+        """Return the policy for a presented key, or None if it is unknown.
+
+        The `INTERNAL_API_KEY` setting is accepted with an unrestricted policy
+        unless the registry lists it with its own policy, or disables it via
+        `INTERNAL_API_KEY_ENABLED` or the file's `allow_internal_api_key`.
+
+        Args:
+            key (str): The raw key from the request.
+        """
+        snapshot = self._snapshot
+        digest = hash_key(key)
+        policy = snapshot.index.get(digest, snapshot.fallback)
+        if policy is not None and hmac.compare_digest(policy.key_sha256, digest):
+            return policy
+        return None
+
+    def watch(self, interval: float) -> None:
+        """Start a background thread reloading the file when it changes.
+
+        Args:
+            interval (float): Seconds between modification-time checks.
+        """
+        if not self.path or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="key-registry", daemon=True
+        )
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop the reload thread started by `watch`, if any."""
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                logger.error("Cannot stat API key registry: %s", e)
+                continue
+            if mtime == self._mtime:
+                continue
+            try:
+                self.load()
+            except (OSError, ValueError) as e:
+                # Remember the broken version so it is not re-read every tick.
+                self._mtime = mtime
+                logger.error("Keeping previous API keys, reload failed: %s", e)
+
+
+key_registry = KeyRegistry(settings.API_KEYS_FILE)
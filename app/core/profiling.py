@@ -0,0 +1,280 @@
+"""Opt-in per-request profiling with stage timings and async stack sampling."""
+
+import asyncio
+import hmac
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+# Where the dump endpoints are mounted; requests to them are never profiled.
+DUMP_PATH = "/internal/profiles"
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "request_profile", default=None
+)
+
+captured: deque = deque(maxlen=settings.PROFILE_BUFFER_SIZE)
+
+
+def _label(frame) -> str:
+    """Return a flamegraph frame label such as `app.services.language:detect`."""
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def _coroutine_frames(coro) -> list:
+    """Walk the await chain of a coroutine, outermost frame first."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+class RequestProfile:
+    """Stage timings and stack samples collected for a single request."""
+
+    def __init__(self, method: str, path: str, forced: bool = False):
+        """Start profiling the request running in the current asyncio task.
+
+        Args:
+            method (str): HTTP method of the request.
+            path (str): Request path.
+            forced (bool): Whether profiling was requested via header, in which
+                case the profile is captured regardless of duration.
+        """
+        self.method = method
+        self.path = path
+        self.forced = forced
+        self.task = asyncio.current_task()
+        self.thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.stages: list[tuple[str, float, float]] = []
+        self.dropped_stages = 0
+        self.samples: Counter = Counter()
+
+    def add_stage(self, name: str, offset_ms: float, duration_ms: float) -> None:
+        """Record a finished stage, counting it instead once the profile is full.
+
+        Capping stages keeps each captured profile bounded in size, even for
+        long streaming requests that run many provider calls.
+        """
+        if len(self.stages) < settings.PROFILE_MAX_STAGES:
+            self.stages.append((name, offset_ms, duration_ms))
+        else:
+            self.dropped_stages += 1
+
+    def sample(self, frames: dict) -> None:
+        """Record one wall-clock sample of the request's async stack.
+
+        The await chain of the request task shows where it is suspended; when
+        the innermost coroutine is running, the loop thread's stack beyond it
+        shows what it is blocked on (e.g. a synchronous SDK call).
+
+        Args:
+            frames (dict): Snapshot from `sys._current_frames()`.
+        """
+        if self.task is None or self.task.done():
+            return
+        stack = _coroutine_frames(self.task.get_coro())
+        thread_frame = frames.get(self.thread_id)
+        if stack and thread_frame is not None:
+            thread_stack = []
+            while thread_frame is not None and thread_frame is not stack[-1]:
+                thread_stack.append(thread_frame)
+                thread_frame = thread_frame.f_back
+            if thread_frame is not None:
+                stack.extend(reversed(thread_stack))
+        if stack:
+            self.samples[tuple(_label(frame) for frame in stack)] += 1
+
+    def finish(self) -> None:
+        """Record the total request duration."""
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+
+    def to_dict(self) -> dict:
+        """Return a JSON-serializable summary of the profile."""
+        return {
+            "method": self.method,
+            "path": self.path,
+            "forced": self.forced,
+            "duration_ms": round(self.duration_ms, 2),
+            "stages": [
+                {"name": name, "offset_ms": round(offset, 2), "ms": round(ms, 2)}
+                for name, offset, ms in self.stages
+            ],
+            "dropped_stages": self.dropped_stages,
+            "samples": sum(self.samples.values()),
+        }
+
+
+class _Stage:
+    """Context manager timing one named stage of a profiled request."""
+
+    __slots__ = ("profile", "name", "started")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        ended = time.perf_counter()
+        self.profile.add_stage(
+            self.name,
+            (self.started - self.profile.started) * 1000,
+            (ended - self.started) * 1000,
+        )
+        return False
+
+
+class _NullStage:
+    """No-op stage used when the current request is not being profiled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """Time a named stage of the current request if it is being profiled.
+
+    Args:
+        name (str): Stage label, e.g. `langdetect` or `provider:gemini-2.5`.
+
+    Returns:
+        A context manager; a shared no-op when profiling is off.
+    """
+    profile = _current.get()
+    if profile is None:
+        return _NULL_STAGE
+    return _Stage(profile, name)
+
+
+class _Sampler:
+    """Background thread sampling the stacks of all active profiles."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles: set[RequestProfile] = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def remove(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self) -> None:
+        interval = settings.PROFILE_INTERVAL_MS / 1000
+        while True:
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+                profiles = list(self._profiles)
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames)
+            del frames
+            time.sleep(interval)
+
+
+_sampler = _Sampler()
+
+
+def _is_forced(scope) -> bool:
+    token = settings.PROFILE_TOKEN
+    if not token:
+        return False
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return hmac.compare_digest(value, token.encode())
+    return False
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests on demand or by sampling rate.
+
+    A request is profiled when it carries an `x-profile` header matching
+    `PROFILE_TOKEN`, or is picked with probability `PROFILE_SAMPLE_RATE`.
+    Profiled requests slower than `PROFILE_SLOW_MS`, and all header-requested
+    ones, are kept in a bounded ring buffer. Unprofiled requests only pay for
+    the header check.
+    """
+
+    def __init__(self, app):
+        """Wrap an ASGI application."""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        """Run the request, profiling it if selected."""
+        if scope["type"] != "http" or scope["path"].startswith(DUMP_PATH):
+            return await self.app(scope, receive, send)
+
+        forced = _is_forced(scope)
+        rate = settings.PROFILE_SAMPLE_RATE
+        if not forced and not (rate and random.random() < rate):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"], forced=forced)
+        token = _current.set(profile)
+        _sampler.add(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _sampler.remove(profile)
+            _current.reset(token)
+            profile.finish()
+            if forced or profile.duration_ms >= settings.PROFILE_SLOW_MS:
+                captured.append(profile)
+                logger.info(
+                    "Captured profile for %s %s (%.1f ms)",
+                    profile.method,
+                    profile.path,
+                    profile.duration_ms,
+                )
+
+
+def folded_stacks() -> str:
+    """Render captured samples in collapsed-stack format for flamegraph tools.
+
+    Returns:
+        str: One `frame;frame;... count` line per distinct stack, rooted at the
+        request method and path.
+    """
+    totals: Counter = Counter()
+    for profile in list(captured):
+        root = f"{profile.method} {profile.path}"
+        for stack, count in profile.samples.items():
+            totals[(root, *stack)] += count
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in totals.items())
@@ -1,26 +1,91 @@
 """Security utilities for internal API protection."""
 
+import hmac
 import logging
-from fastapi import Header, HTTPException, status
+from fastapi import Header, HTTPException, Request, status
 from app.core.config import settings
+from app.core.keys import current_key, key_registry
+from app.core.tracing import span
 
 logger = logging.getLogger(__name__)
 
 
-def verify_internal_api_key(x_api_key: str = Header(default=None, alias="x-api-key")):
-    """Verify requests contain a valid internal API key.
+async def verify_internal_api_key(
+    request: Request, x_api_key: str = Header(default=None, alias="x-api-key")
+):
+    """Verify requests contain a valid internal API key and resolve its policy.
+
+    The key's policy is attached to `request.state.api_key` and to the
+    `current_key` context variable for the services handling the request.
 
     Args:
+        request (Request): The incoming request.
         x_api_key (str): The API key from the `x-api-key` header.
 
     Raises:
-        HTTPException: If the API key is missing or invalid.
+        HTTPException: If the API key is missing or invalid, or the key may not
+            call this endpoint.
+    """
+    with span("auth"):
+        policy = key_registry.lookup(x_api_key) if x_api_key is not None else None
+        if policy is None:
+            logger.warning("Unauthorized request: missing or invalid x-api-key")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or missing API key",
+            )
+        if not policy.allows(request.url.path):
+            logger.warning("API key %s may not call %s", policy.name, request.url.path)
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="API key is not allowed to call this endpoint",
+            )
+
+    request.state.api_key = policy
+    current_key.set(policy)
+    logger.info("Internal API key validated: %s", policy.name)
+
+
+async def verify_profile_token(
+    x_profile: str = Header(default=None, alias="x-profile"),
+):
+    """Verify requests to internal profile dumps carry the `PROFILE_TOKEN`.
+
+    Captured profiles include paths, timings and code stacks from every
+    tenant, so API keys alone do not grant access.
+
+    Args:
+        x_profile (str): The token from the `x-profile` header.
+
+    Raises:
+        HTTPException: If no token is configured or the header does not match.
     """
-    if x_api_key is None or x_api_key != settings.INTERNAL_API_KEY:
-        logger.warning("Unauthorized request: missing or invalid x-api-key")
+    token = settings.PROFILE_TOKEN
+    if (
+        not token
+        or x_profile is None
+        or not hmac.compare_digest(x_profile.encode(), token.encode())
+    ):
+        logger.warning("Forbidden request for profile dumps")
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing API key",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Profile dumps require a valid x-profile token",
         )
 
-    logger.info("Internal API key validated")
+
+def check_text_size(text: str) -> None:
+    """Enforce the current key's maximum text size.
+
+    Args:
+        text (str): Input text of the request or bulk item.
+
+    Raises:
+        HTTPException: If the text exceeds the key's `max_text_chars`.
+    """
+    policy = current_key.get()
+    if policy is not None and policy.max_text_chars is not None:
+        if len(text) > policy.max_text_chars:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Text exceeds {policy.max_text_chars} characters",
+            )
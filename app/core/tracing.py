@@ -0,0 +1,414 @@
+"""Lightweight request tracing with W3C trace context and pluggable exporters.
+
+Spans follow the OpenTelemetry data model and serialize to OTLP/JSON. The file
+exporter writes one `ExportTraceServiceRequest` per line, the format read by
+the OpenTelemetry Collector's `otlpjsonfile` receiver.
+"""
+
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional, Protocol
+from app.core.config import settings
+from app.core.profiling import stage
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = b"traceparent"
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_CODE_ERROR = 2
+
+SERVICE_NAME = "cleartext-api"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def _otlp_value(value) -> dict:
+    """Wrap an attribute value in its OTLP `AnyValue` JSON form."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "trace",
+        "name",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "error",
+    )
+
+    def __init__(
+        self,
+        trace: "Trace",
+        name: str,
+        parent_id: Optional[str],
+        attributes: dict,
+        kind: int = SPAN_KIND_INTERNAL,
+    ):
+        """Start a span in the given trace."""
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        """Return the span duration in milliseconds."""
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict:
+        """Return the span as an OTLP/JSON `Span` object."""
+        otlp = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": (
+                {"code": STATUS_CODE_ERROR, "message": self.error} if self.error else {}
+            ),
+        }
+        if self.parent_id:
+            otlp["parentSpanId"] = self.parent_id
+        return otlp
+
+
+def to_otlp(spans: list[Span]) -> dict:
+    """Wrap spans in an OTLP/JSON `ExportTraceServiceRequest` envelope.
+
+    Args:
+        spans (list[Span]): Finished spans, typically one trace.
+
+    Returns:
+        dict: A `resourceSpans` payload accepted by OTLP/HTTP JSON endpoints.
+    """
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": _otlp_value(SERVICE_NAME)}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class Trace:
+    """Spans recorded for one request, plus its head sampling decision.
+
+    At most `TRACE_MAX_SPANS` child spans are kept, so long streaming requests
+    do not grow memory with their input; extra spans are only counted.
+    """
+
+    def __init__(self, trace_id: Optional[str] = None, sampled: bool = False):
+        """Create a trace, continuing `trace_id` if one was propagated."""
+        self.trace_id = trace_id or f"{random.getrandbits(128):032x}"
+        self.sampled = sampled
+        self.spans: list[Span] = []
+        self.dropped = 0
+        self.failed = False
+
+    def add(self, span: Span) -> None:
+        """Keep a finished child span, or count it if the trace is full."""
+        if span.error:
+            self.failed = True
+        if len(self.spans) < settings.TRACE_MAX_SPANS:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+
+class SpanExporter(Protocol):
+    """Destination for finished traces."""
+
+    def export(self, spans: list[Span]) -> None:
+        """Export the spans of one kept trace."""
+
+
+class InMemorySpanExporter:
+    """Exporter that keeps spans in a list, for tests and local debugging."""
+
+    def __init__(self):
+        """Create an empty exporter."""
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        """Append the spans of a trace."""
+        self.spans.extend(spans)
+
+    def clear(self) -> None:
+        """Drop all collected spans."""
+        self.spans.clear()
+
+
+class FileSpanExporter:
+    """Exporter that appends each trace to a file as one line of OTLP/JSON.
+
+    Traces are handed to a background writer thread, so exporting never blocks
+    the event loop on disk I/O. When the writer falls more than `max_pending`
+    traces behind, new traces are dropped rather than buffered.
+    """
+
+    max_pending = 1024
+
+    def __init__(self, path: str):
+        """Create an exporter writing to `path` and start its writer thread."""
+        self.path = path
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_pending)
+        self._writer = threading.Thread(
+            target=self._write, name="trace-file-exporter", daemon=True
+        )
+        self._writer.start()
+
+    def export(self, spans: list[Span]) -> None:
+        """Queue the spans of a trace for writing."""
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            logger.warning("Trace export queue full, dropping trace")
+
+    def flush(self) -> None:
+        """Block until every queued trace has been written."""
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        """Write pending traces and stop the writer thread."""
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                if spans is None:
+                    return
+                line = json.dumps(to_otlp(spans)) + "\n"
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except Exception:
+                logger.exception("Failed to write traces to %s", self.path)
+            finally:
+                self._queue.task_done()
+
+
+def _exporter_from_settings() -> Optional[SpanExporter]:
+    if settings.TRACE_EXPORTER == "memory":
+        return InMemorySpanExporter()
+    if settings.TRACE_EXPORTER == "file":
+        return FileSpanExporter(settings.TRACE_FILE)
+    return None
+
+
+_exporter: Optional[SpanExporter] = _exporter_from_settings()
+
+
+def set_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Replace the active exporter; None disables tracing.
+
+    Args:
+        exporter (Optional[SpanExporter]): Any object with an `export(spans)` method.
+    """
+    global _exporter
+    _exporter = exporter
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """Return the active exporter, if tracing is enabled."""
+    return _exporter
+
+
+def shutdown_exporter() -> None:
+    """Flush and stop the active exporter, if it supports `shutdown()`.
+
+    Called when the app stops, so traces still queued for a background writer
+    are not lost.
+    """
+    shutdown = getattr(_exporter, "shutdown", None)
+    if shutdown is not None:
+        shutdown()
+
+
+class _SpanContext:
+    """Context manager recording a child span of the current span."""
+
+    __slots__ = ("parent", "name", "attributes", "span", "token", "stage")
+
+    def __init__(self, parent: Span, name: str, attributes: dict):
+        self.parent = parent
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        self.stage = stage(self.name)
+        self.stage.__enter__()
+        self.span = Span(
+            self.parent.trace, self.name, self.parent.span_id, self.attributes
+        )
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end_ns = time.time_ns()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        self.span.trace.add(self.span)
+        _current_span.reset(self.token)
+        return self.stage.__exit__(exc_type, exc, tb)
+
+
+def span(name: str, **attributes):
+    """Record a child span of the current request's trace.
+
+    The same block is also timed as a profiling stage, so call sites only need
+    one instrumentation point. Outside a traced request this is exactly
+    `profiling.stage(name)`.
+
+    Args:
+        name (str): Span name, e.g. `langdetect` or `provider:gemini-2.5`.
+        **attributes: Span attributes.
+
+    Returns:
+        A context manager.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return stage(name)
+    return _SpanContext(parent, name, attributes)
+
+
+def parse_traceparent(value: str) -> Optional[tuple[str, str, bool]]:
+    """Parse a W3C `traceparent` header.
+
+    Args:
+        value (str): Header value, e.g. `00-<trace-id>-<parent-id>-01`.
+
+    Returns:
+        Optional[tuple[str, str, bool]]: Trace id, parent span id and sampled
+        flag, or None if the header is malformed.
+    """
+    match = _TRACEPARENT.match(value.strip().lower())
+    if not match:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def _should_export(trace: Trace, root: Span) -> bool:
+    """Keep head-sampled traces, and always keep failed or slow ones."""
+    return (
+        trace.sampled
+        or trace.failed
+        or root.error is not None
+        or root.duration_ms >= settings.TRACE_SLOW_MS
+    )
+
+
+class TracingMiddleware:
+    """ASGI middleware creating a root span per request.
+
+    Incoming `traceparent` headers are continued, and the response carries a
+    `traceparent` header for the root span. Head sampling follows the parent's
+    sampled flag, or `TRACE_SAMPLE_RATE` for new traces; tail sampling always
+    keeps traces that failed or took longer than `TRACE_SLOW_MS`.
+    """
+
+    def __init__(self, app):
+        """Wrap an ASGI application."""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        """Run the request inside a root span when tracing is enabled."""
+        exporter = _exporter
+        if scope["type"] != "http" or exporter is None:
+            return await self.app(scope, receive, send)
+
+        parent = None
+        for name, value in scope["headers"]:
+            if name == TRACEPARENT_HEADER:
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        if parent:
+            trace = Trace(parent[0], sampled=parent[2])
+        else:
+            trace = Trace(sampled=random.random() < settings.TRACE_SAMPLE_RATE)
+
+        method, path = scope["method"], scope["path"]
+        root = Span(
+            trace,
+            f"{method} {path}",
+            parent[1] if parent else None,
+            {"http.method": method, "http.target": path},
+            kind=SPAN_KIND_SERVER,
+        )
+        token = _current_span.set(root)
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    root.error = f"HTTP {message['status']}"
+                flags = "01" if trace.sampled else "00"
+                traceparent = f"00-{trace.trace_id}-{root.span_id}-{flags}"
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (TRACEPARENT_HEADER, traceparent.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except Exception as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            root.end_ns = time.time_ns()
+            if trace.dropped:
+                root.attributes["tracing.dropped_spans"] = trace.dropped
+            trace.spans.append(root)
+            if _should_export(trace, root):
+                try:
+                    exporter.export(trace.spans)
+                except Exception:
+                    logger.exception("Failed to export trace %s", trace.trace_id)
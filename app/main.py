@@ -3,15 +3,19 @@
 import asyncio
 import logging
 import random
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import PlainTextResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from starlette.middleware.cors import CORSMiddleware
 
-from app.api.router import api_router
+from app.api.router import api_router, internal_router
 from app.core.config import settings
+from app.core.keys import key_registry
 from app.core.logging import setup_logging
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware, shutdown_exporter
 
 log_level = logging.DEBUG if settings.ENV == "development" else logging.INFO
 setup_logging(level=log_level)
@@ -19,6 +23,16 @@ setup_logging(level=log_level)
 
 limiter = Limiter(key_func=get_remote_address)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background threads for the app's lifetime and flush traces on exit."""
+    key_registry.watch(settings.API_KEYS_RELOAD_SECONDS)
+    yield
+    key_registry.stop()
+    shutdown_exporter()
+
+
 app = FastAPI(
     title="Cleartext API",
     description="A language-processing API with summarization, rewriting, and language detection.",
@@ -26,6 +40,7 @@ app = FastAPI(
     docs_url="/docs" if settings.docs_enabled else None,
     redoc_url="/redoc" if settings.docs_enabled else None,
     openapi_url="/openapi.json" if settings.docs_enabled else None,
+    lifespan=lifespan,
 )
 
 
@@ -48,5 +63,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
+
 app.state.limiter = limiter
 app.include_router(api_router)
+app.include_router(internal_router)
@@ -0,0 +1,107 @@
+"""Bounded-concurrency NDJSON stream processing for bulk requests."""
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[bytes]:
+    """Split a byte stream into non-empty lines without buffering the whole body.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Raw body chunks as they arrive.
+        max_line_bytes (int): Largest accepted line, to keep memory bounded.
+
+    Yields:
+        bytes: Each non-blank line, without its trailing newline.
+
+    Raises:
+        ValueError: If a single line exceeds `max_line_bytes`.
+    """
+    too_long = f"Line exceeds {max_line_bytes} bytes"
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if len(line) > max_line_bytes:
+                raise ValueError(too_long)
+            if line.strip():
+                yield line
+        if len(buffer) > max_line_bytes:
+            raise ValueError(too_long)
+
+    if buffer.strip():
+        yield buffer
+
+
+async def stream_ndjson(
+    chunks: AsyncIterator[bytes],
+    handle: Callable[[int, bytes], Awaitable[dict]],
+    concurrency: int,
+    max_line_bytes: int,
+) -> AsyncIterator[str]:
+    """Process NDJSON items concurrently and yield results as each one finishes.
+
+    Input is only read while fewer than `concurrency` items are in flight, and
+    finished results are parked in a queue of the same size, so a slow provider
+    or a slow reader stops the stream from consuming more input.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Raw request body chunks.
+        handle (Callable[[int, bytes], Awaitable[dict]]): Processes one line,
+            given its zero-based index, and returns a JSON-serializable result.
+        concurrency (int): Maximum number of items processed at once.
+        max_line_bytes (int): Largest accepted input line.
+
+    Yields:
+        str: One JSON document per processed item, newline-terminated. If
+        the input cannot be read to the end, a last record carries the index
+        of the first unread item and a 413 or 500 status.
+    """
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    slots = asyncio.Semaphore(concurrency)
+    pending: set[asyncio.Task] = set()
+    done = object()
+
+    async def run(index: int, line: bytes) -> None:
+        try:
+            await results.put(await handle(index, line))
+        finally:
+            slots.release()
+
+    async def feed() -> None:
+        index = 0
+        try:
+            async for line in iter_lines(chunks, max_line_bytes):
+                await slots.acquire()
+                task = asyncio.create_task(run(index, line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                index += 1
+        except ValueError as e:
+            logger.warning("Bulk stream aborted after %d items: %s", index, e)
+            await results.put({"index": index, "status": 413, "error": str(e)})
+        except Exception as e:
+            logger.warning("Bulk stream input failed after %d items: %s", index, e)
+            await results.put(
+                {"index": index, "status": 500, "error": "Reading input failed"}
+            )
+
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await results.put(done)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while (result := await results.get()) is not done:
+            yield json.dumps(result) + "\n"
+    finally:
+        feeder.cancel()
+        for task in list(pending):
+            task.cancel()
@@ -1,6 +1,7 @@
 """Utility for language detection using langdetect."""
 
 from langdetect import detect, LangDetectException
+from app.core.tracing import span
 
 COMMON_LANGUAGE_CODES = {
     "en",
@@ -34,7 +35,8 @@ def detect_language(text: str) -> str:
         dict: Detected language and probability score.
     """
     try:
-        language = detect(text)
+        with span("langdetect"):
+            language = detect(text)
         if language not in COMMON_LANGUAGE_CODES:
             return "unknown"
         return language
@@ -0,0 +1,37 @@
+"""Normalized provider errors shared by the LLM wrappers."""
+
+from enum import Enum
+from typing import Optional
+
+
+class ErrorCategory(str, Enum):
+    """How the fallback chain should react to a provider failure."""
+
+    TRANSIENT = "transient"
+    RATE_LIMITED = "rate_limited"
+    FATAL_REQUEST = "fatal_request"
+    FATAL_MODEL = "fatal_model"
+    FATAL_PROVIDER = "fatal_provider"
+
+
+class ProviderError(Exception):
+    """A provider failure classified into an `ErrorCategory`.
+
+    Attributes:
+        category (ErrorCategory): Retry/fallback behaviour for this failure.
+        status_code (int): HTTP status to surface if this is the final error.
+        retry_after (Optional[float]): Seconds the provider asked us to wait.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        category: ErrorCategory,
+        status_code: int = 503,
+        retry_after: Optional[float] = None,
+    ):
+        """Create a classified provider error."""
+        super().__init__(message)
+        self.category = category
+        self.status_code = status_code
+        self.retry_after = retry_after
@@ -1,7 +1,13 @@
 """Gemini model wrapper for summarization, rewriting, and title generation."""
 
+import asyncio
+from typing import Optional
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from google.generativeai.types import BlockedPromptException, StopCandidateException
 from app.core.config import settings
+from app.core.tracing import span
+from app.services.llm.errors import ErrorCategory, ProviderError
 
 genai.configure(api_key=settings.GEMINI_API_KEY)
 
@@ -20,6 +26,123 @@ def get_model(variant: str = "1.5"):
     return _models.get(variant, _models["1.5"])
 
 
+def _is_safety_stop(candidate) -> bool:
+    """Return True if a candidate stopped because of a safety filter."""
+    return getattr(getattr(candidate, "finish_reason", None), "name", None) == "SAFETY"
+
+
+def _retry_delay(error: google_exceptions.GoogleAPICallError):
+    """Return the server-suggested retry delay in seconds, if any."""
+    for detail in error.details:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+    return None
+
+
+def classify_error(error: Exception) -> Optional[ProviderError]:
+    """Map a Gemini SDK exception onto a `ProviderError` category.
+
+    Args:
+        error (Exception): The exception raised by the SDK.
+
+    Returns:
+        Optional[ProviderError]: The classified error, or None if unrecognized.
+    """
+    if isinstance(error, BlockedPromptException) or (
+        # Raised for any non-STOP finish reason; only safety stops are
+        # request-fatal, the rest fall through to the next model.
+        isinstance(error, StopCandidateException)
+        and error.args
+        and _is_safety_stop(error.args[0])
+    ):
+        return ProviderError(
+            "Content blocked by Gemini safety filters",
+            ErrorCategory.FATAL_REQUEST,
+            status_code=422,
+        )
+    if isinstance(error, google_exceptions.ResourceExhausted):
+        return ProviderError(
+            f"Gemini rate limited: {error.message}",
+            ErrorCategory.RATE_LIMITED,
+            status_code=429,
+            retry_after=_retry_delay(error),
+        )
+    if (
+        isinstance(error, google_exceptions.Unauthenticated)
+        or getattr(error, "reason", None) == "API_KEY_INVALID"
+    ):
+        return ProviderError(
+            f"Gemini unavailable: {error.message}", ErrorCategory.FATAL_PROVIDER
+        )
+    if isinstance(
+        error, (google_exceptions.NotFound, google_exceptions.PermissionDenied)
+    ):
+        # Usually a retired model ID or one the account cannot use.
+        return ProviderError(
+            f"Gemini model unavailable: {error.message}", ErrorCategory.FATAL_MODEL
+        )
+    if isinstance(
+        error,
+        (
+            google_exceptions.InvalidArgument,
+            google_exceptions.FailedPrecondition,
+            google_exceptions.OutOfRange,
+        ),
+    ):
+        return ProviderError(
+            f"Gemini rejected the request: {error.message}",
+            ErrorCategory.FATAL_REQUEST,
+            status_code=422,
+        )
+    if isinstance(error, google_exceptions.DeadlineExceeded):
+        return ProviderError(
+            "Gemini request timed out", ErrorCategory.TRANSIENT, status_code=504
+        )
+    if isinstance(error, (google_exceptions.ServerError, google_exceptions.Aborted)):
+        return ProviderError(
+            f"Gemini server error: {error.message}", ErrorCategory.TRANSIENT
+        )
+    return None
+
+
+def _is_safety_block(response) -> bool:
+    """Return True if the prompt or the first candidate was blocked for safety."""
+    if getattr(response.prompt_feedback, "block_reason", None):
+        return True
+    candidates = response.candidates
+    return bool(candidates) and _is_safety_stop(candidates[0])
+
+
+async def _generate(model, prompt: str) -> str:
+    """Run a prompt, raising classified errors for failures and blocked output.
+
+    The SDK call blocks, so it runs in a worker thread to keep concurrent
+    requests and bulk items from serializing on the event loop.
+    """
+    try:
+        with span("gemini.generate_content", model=model.model_name):
+            response = await asyncio.to_thread(model.generate_content, prompt)
+    except Exception as e:
+        error = classify_error(e)
+        if error is None:
+            raise
+        raise error from e
+
+    try:
+        return response.text
+    except ValueError as e:
+        # The `text` accessor also raises for empty candidates and for
+        # MAX_TOKENS/RECITATION stops; only safety blocks are request-fatal.
+        if not _is_safety_block(response):
+            raise
+        raise ProviderError(
+            "Content blocked by Gemini safety filters",
+            ErrorCategory.FATAL_REQUEST,
+            status_code=422,
+        ) from e
+
+
 async def summarize(text: str, length: str = "short", variant: str = "2.5") -> str:
     """Summarize input text using a fallback chain of supported LLM providers.
 
@@ -27,8 +150,7 @@ async def summarize(text: str, length: str = "short", variant: str = "2.5") -> s
     """
     model = get_model(variant)
     prompt = f"Summarize the following text in a {length} way:\n\n{text}"
-    response = model.generate_content(prompt)
-    return response.text.strip()
+    return (await _generate(model, prompt)).strip()
 
 
 async def rewrite(text: str, style: str = "simple", variant: str = "2.5") -> str:
@@ -38,8 +160,7 @@ async def rewrite(text: str, style: str = "simple", variant: str = "2.5") -> str
     """
     model = get_model(variant)
     prompt = f"Rewrite the following text in a more {style} tone:\n\n{text}"
-    response = model.generate_content(prompt)
-    return response.text.strip()
+    return (await _generate(model, prompt)).strip()
 
 
 async def generate_title(text: str, variant: str = "2.5") -> str:
@@ -58,5 +179,4 @@ Title:
     if not model:
         raise ValueError(f"Unknown Gemini model variant: {variant}")
 
-    response = model.generate_content(prompt)
-    return response.text.strip().strip('"')
+    return (await _generate(model, prompt)).strip().strip('"')
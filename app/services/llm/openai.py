@@ -1,46 +1,131 @@
 """OpenAI wrapper for summarization, rewriting, and title generation."""
 
+from typing import Optional
 import openai
 from app.core.config import settings
+from app.core.tracing import span
+from app.services.llm.errors import ErrorCategory, ProviderError
 
-openai.api_key = settings.OPENAI_API_KEY
 MODEL_IDS = {
     "4o-mini": "gpt-4o-mini",
     "4.1-mini": "gpt-4.1-mini",
     "o3-mini": "o3-mini",
 }
 
+_client: Optional[openai.AsyncOpenAI] = None
 
-def get_model(variant: str = "3.5") -> str:
+
+def _get_client() -> openai.AsyncOpenAI:
+    """Return the shared async client, creating it on first use.
+
+    SDK-level retries are disabled; `llm_provider.fallback_chain` owns retries.
+    """
+    global _client
+    if _client is None:
+        _client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+    return _client
+
+
+def get_model(variant: str = "4o-mini") -> str:
     """Return the OpenAI model name based on the specified variant."""
-    return MODEL_IDS.get(variant, MODEL_IDS["3.5"])
+    return MODEL_IDS.get(variant, MODEL_IDS["4o-mini"])
+
+
+def _retry_after(error: openai.APIStatusError):
+    """Return the `retry-after-ms` or `retry-after` header in seconds, if any."""
+    headers = error.response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def classify_error(error: Exception) -> Optional[ProviderError]:
+    """Map an OpenAI SDK exception onto a `ProviderError` category.
+
+    Args:
+        error (Exception): The exception raised by the SDK.
+
+    Returns:
+        Optional[ProviderError]: The classified error, or None if unrecognized.
+    """
+    if isinstance(error, openai.RateLimitError):
+        if error.code == "insufficient_quota":
+            return ProviderError("OpenAI quota exhausted", ErrorCategory.FATAL_PROVIDER)
+        return ProviderError(
+            "OpenAI rate limited",
+            ErrorCategory.RATE_LIMITED,
+            status_code=429,
+            retry_after=_retry_after(error),
+        )
+    if isinstance(error, openai.ContentFilterFinishReasonError):
+        return ProviderError(
+            "Content blocked by OpenAI content filter",
+            ErrorCategory.FATAL_REQUEST,
+            status_code=422,
+        )
+    if isinstance(error, openai.AuthenticationError):
+        return ProviderError(
+            f"OpenAI unavailable: {error.message}", ErrorCategory.FATAL_PROVIDER
+        )
+    if isinstance(error, (openai.NotFoundError, openai.PermissionDeniedError)):
+        # Usually a retired model or one the account cannot use.
+        return ProviderError(
+            f"OpenAI model unavailable: {error.message}", ErrorCategory.FATAL_MODEL
+        )
+    if isinstance(error, (openai.BadRequestError, openai.UnprocessableEntityError)):
+        status_code = 413 if error.code == "context_length_exceeded" else 422
+        return ProviderError(
+            f"OpenAI rejected the request: {error.message}",
+            ErrorCategory.FATAL_REQUEST,
+            status_code=status_code,
+        )
+    if isinstance(error, openai.APITimeoutError):
+        return ProviderError(
+            "OpenAI request timed out", ErrorCategory.TRANSIENT, status_code=504
+        )
+    if isinstance(
+        error,
+        (openai.APIConnectionError, openai.InternalServerError, openai.ConflictError),
+    ):
+        return ProviderError(f"OpenAI error: {error.message}", ErrorCategory.TRANSIENT)
+    return None
+
+
+async def _complete(variant: str, prompt: str) -> str:
+    """Run a single-message chat completion, raising classified errors."""
+    model = get_model(variant)
+    try:
+        with span("openai.chat_completion", model=model):
+            response = await _get_client().chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+            )
+    except Exception as e:
+        error = classify_error(e)
+        if error is None:
+            raise
+        raise error from e
+    return response.choices[0].message.content
 
 
-async def summarize(text: str, length: str = "short", variant: str = "3.5") -> str:
+async def summarize(text: str, length: str = "short", variant: str = "4o-mini") -> str:
     """Summarize input text using the selected OpenAI model."""
     prompt = f"Summarize the following text in a {length} way:\n\n{text}"
-    response = await openai.ChatCompletion.acreate(
-        model=get_model(variant),
-        messages=[{"role": "user", "content": prompt}],
-    )
-    return response.choices[0].message.content.strip()
+    return (await _complete(variant, prompt)).strip()
 
 
-async def rewrite(text: str, style: str = "simple", variant: str = "3.5") -> str:
+async def rewrite(text: str, style: str = "simple", variant: str = "4o-mini") -> str:
     """Rewrite input text using the specified tone and OpenAI model."""
     prompt = f"Rewrite this text in a more {style} tone:\n\n{text}"
-    response = await openai.ChatCompletion.acreate(
-        model=get_model(variant),
-        messages=[{"role": "user", "content": prompt}],
-    )
-    return response.choices[0].message.content.strip()
+    return (await _complete(variant, prompt)).strip()
 
 
-async def generate_title(text: str, variant: str = "3.5") -> str:
+async def generate_title(text: str, variant: str = "4o-mini") -> str:
     """Generate a concise title using the selected OpenAI model."""
     prompt = f"Create a short, engaging title for:\n\n{text}"
-    response = await openai.ChatCompletion.acreate(
-        model=get_model(variant),
-        messages=[{"role": "user", "content": prompt}],
-    )
-    return response.choices[0].message.content.strip().strip('"')
+    return (await _complete(variant, prompt)).strip().strip('"')
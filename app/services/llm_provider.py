@@ -1,16 +1,93 @@
 """LLM provider orchestrator with fallback across providers."""
 
+import asyncio
 import logging
+import math
+import random
+from typing import Optional
 from fastapi import HTTPException
 from app.core.config import settings
+from app.core.keys import current_key
+from app.core.tracing import span
 from app.services.llm import gemini, openai
+from app.services.llm.errors import ErrorCategory, ProviderError
 
 logger = logging.getLogger(__name__)
 
 
+class RetryBudget:
+    """Process-wide token bucket limiting same-model retries.
+
+    Every chain call deposits `ratio` tokens and every retry withdraws one, so
+    retries stay a bounded fraction of traffic when a provider degrades.
+    """
+
+    def __init__(self, ratio: float, capacity: float):
+        """Create a full budget.
+
+        Args:
+            ratio (float): Tokens earned per chain call.
+            capacity (float): Maximum number of banked tokens.
+        """
+        self.ratio = ratio
+        self.capacity = capacity
+        self.tokens = capacity
+
+    def deposit(self) -> None:
+        """Earn retry tokens for one chain call."""
+        self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spend one token for a retry, returning False if none are left."""
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+retry_budget = RetryBudget(
+    settings.LLM_RETRY_BUDGET_RATIO, settings.LLM_RETRY_BUDGET_CAPACITY
+)
+
+
+def _retry_delay(error: ProviderError, attempt: int) -> Optional[float]:
+    """Return how long to wait before retrying the same model, or None to move on."""
+    if attempt >= settings.LLM_MAX_RETRIES_PER_MODEL:
+        return None
+    base = settings.LLM_RETRY_BASE_DELAY
+    if error.category is ErrorCategory.RATE_LIMITED and error.retry_after is not None:
+        if error.retry_after > settings.LLM_MAX_RETRY_AFTER:
+            return None
+        return error.retry_after + random.uniform(0, base)
+    if error.category in (ErrorCategory.TRANSIENT, ErrorCategory.RATE_LIMITED):
+        return random.uniform(0, base * 2**attempt)
+    return None
+
+
+def _exhausted(error: Optional[Exception]) -> HTTPException:
+    """Build the error returned when every provider in the chain has failed."""
+    if not isinstance(error, ProviderError):
+        return HTTPException(status_code=503, detail="All providers failed")
+    headers = None
+    if error.category is ErrorCategory.RATE_LIMITED and error.retry_after is not None:
+        headers = {"Retry-After": str(math.ceil(error.retry_after))}
+    return HTTPException(
+        status_code=error.status_code,
+        detail=f"All providers failed: {error}",
+        headers=headers,
+    )
+
+
 async def fallback_chain(operations):
     """Attempt multiple providers in order, returning the first successful result.
 
+    Classified provider errors decide what happens next: transient and
+    rate-limited errors are retried on the same model with jittered backoff
+    (honouring Retry-After) while the global retry budget allows, request-fatal
+    errors stop the chain immediately, provider-fatal errors skip the
+    remaining models of that provider, and model-fatal and unclassified errors
+    move on to the next model.
+
     Args:
         operations (list[tuple[str, Callable[[], Awaitable]]]): List of (provider_name, async function)
 
@@ -18,18 +95,75 @@ async def fallback_chain(operations):
         tuple: A tuple of (result, provider_name) from the first successful provider.
 
     Raises:
-        HTTPException: If all providers fail.
+        HTTPException: With the request-fatal error's status, or with the last
+            error's status once all providers fail.
     """
+    with span("fallback_chain", providers=len(operations)):
+        return await _run_chain(operations)
+
+
+async def _run_chain(operations):
+    """Walk the chain for `fallback_chain` inside its span."""
+    retry_budget.deposit()
+    last_error = None
+    failed_providers = set()
+
     for provider, fn in operations:
-        try:
-            logger.debug("Trying provider: %s", provider)
-            return await fn(), provider
-        except Exception as e:
-            logger.warning("Provider %s failed: %s", provider, str(e))
+        family = provider.split("-")[0]
+        if family in failed_providers:
+            logger.debug("Skipping provider %s: %s is unavailable", provider, family)
             continue
 
+        attempt = 0
+        while True:
+            try:
+                logger.debug("Trying provider: %s", provider)
+                with span(f"provider:{provider}", attempt=attempt):
+                    return await fn(), provider
+            except ProviderError as e:
+                last_error = e
+                logger.warning(
+                    "Provider %s failed (%s): %s", provider, e.category.value, str(e)
+                )
+                if e.category is ErrorCategory.FATAL_REQUEST:
+                    raise HTTPException(status_code=e.status_code, detail=str(e))
+                if e.category is ErrorCategory.FATAL_PROVIDER:
+                    failed_providers.add(family)
+                    break
+                if e.category is ErrorCategory.FATAL_MODEL:
+                    break
+                delay = _retry_delay(e, attempt)
+                if delay is None or not retry_budget.withdraw():
+                    break
+                attempt += 1
+                logger.info("Retrying provider %s in %.2fs", provider, delay)
+                await asyncio.sleep(delay)
+            except Exception as e:
+                last_error = e
+                logger.warning("Provider %s failed: %s", provider, str(e))
+                break
+
     logger.error("All providers failed during fallback chain")
-    raise HTTPException(status_code=503, detail="All providers failed")
+    raise _exhausted(last_error)
+
+
+def _apply_key_policy(operations):
+    """Restrict and reorder a chain to the current API key's preferred providers."""
+    policy = current_key.get()
+    if policy is None or policy.providers is None:
+        return operations
+    by_name = dict(operations)
+    selected = [(name, by_name[name]) for name in policy.providers if name in by_name]
+    if not selected:
+        logger.error("No configured providers for API key %s", policy.name)
+        raise HTTPException(
+            status_code=503,
+            detail=(
+                "None of the providers allowed for this API key are configured: "
+                + ", ".join(policy.providers)
+            ),
+        )
+    return selected
 
 
 async def summarize(text: str, length: str = "short") -> dict:
@@ -49,7 +183,7 @@ async def summarize(text: str, length: str = "short") -> dict:
             ("openai-o3-mini", lambda: openai.summarize(text, length, "o3-mini")),
         ]
 
-    result, provider = await fallback_chain(chain)
+    result, provider = await fallback_chain(_apply_key_policy(chain))
     logger.info("Summarization handled by provider: %s", provider)
     return {"summary": result, "provider": provider}
 
@@ -71,7 +205,7 @@ async def rewrite(text: str, style: str = "simple") -> dict:
             ("openai-o3-mini", lambda: openai.rewrite(text, style, "o3-mini")),
         ]
 
-    result, provider = await fallback_chain(chain)
+    result, provider = await fallback_chain(_apply_key_policy(chain))
     logger.info("Rewrite handled by provider: %s", provider)
     return {"rewritten": result, "provider": provider}
 
@@ -93,6 +227,6 @@ async def generate_title(text: str) -> str:
             ("openai-o3-mini", lambda: openai.generate_title(text, "o3-mini")),
         ]
 
-    result, provider = await fallback_chain(chain)
+    result, provider = await fallback_chain(_apply_key_policy(chain))
     logger.info("Title generated using provider: %s", provider)
     return result
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from starlette.requests import ClientDisconnect
+from app.api.endpoints.bulk import NDJSONResponse
+from app.core.config import settings
+from app.services.bulk import stream_ndjson
+
+
+def _ndjson(*items):
+    return "\n".join(json.dumps(item) for item in items) + "\n"
+
+
+def _parse(response):
+    return sorted(
+        (json.loads(line) for line in response.text.splitlines()),
+        key=lambda r: r["index"],
+    )
+
+
+def test_bulk_mixed_operations(client):
+    with (
+        patch(
+            "app.api.endpoints.bulk.summarize",
+            return_value={"summary": "Mock summary", "provider": "mock"},
+        ),
+        patch("app.api.endpoints.bulk.generate_title", return_value="Mock Title"),
+        patch("app.api.endpoints.bulk.detect_language", return_value="fr"),
+    ):
+        response = client.post(
+            "/bulk/",
+            content=_ndjson(
+                {"id": "a", "op": "summarize", "text": "Some text"},
+                {"id": "b", "op": "title", "text": "Some text"},
+                {"id": "c", "op": "language-detect", "text": "Bonjour"},
+            ),
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = _parse(response)
+    assert [r["id"] for r in results] == ["a", "b", "c"]
+    assert results[0]["result"] == {"summary": "Mock summary", "provider": "mock"}
+    assert results[1]["result"] == {"title": "Mock Title"}
+    assert results[2]["result"] == {"language": "fr"}
+    assert all(r["status"] == 200 for r in results)
+
+
+def test_bulk_reports_item_errors_without_failing_stream(client):
+    response = client.post(
+        "/bulk/",
+        content="not json\n"
+        + _ndjson(
+            {"op": "translate", "text": "Hello"},
+            {"op": "rewrite", "text": "Hello", "style": "ye olde medieval"},
+        ),
+    )
+
+    assert response.status_code == 200
+    results = _parse(response)
+    assert len(results) == 3
+    assert all(r["status"] == 422 for r in results)
+    assert "op must be one of" in results[1]["error"]
+
+
+def test_bulk_runs_blocking_provider_calls_concurrently(client, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_CONCURRENCY", 4)
+
+    def slow_generate(prompt):
+        time.sleep(0.2)
+        return Mock(text="Mock summary")
+
+    model = Mock(model_name="models/test", generate_content=slow_generate)
+    with patch("app.services.llm.gemini.get_model", return_value=model):
+        start = time.monotonic()
+        response = client.post(
+            "/bulk/",
+            content=_ndjson(*({"op": "summarize", "text": "Some text"},) * 4),
+        )
+        elapsed = time.monotonic() - start
+
+    assert [r["status"] for r in _parse(response)] == [200] * 4
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_stream_ndjson_bounds_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def chunks():
+        for i in range(10):
+            yield f'{{"n": {i}}}\n'.encode()
+
+    async def handle(index, line):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"index": index}
+
+    lines = [line async for line in stream_ndjson(chunks(), handle, 3, 1024)]
+
+    assert sorted(json.loads(line)["index"] for line in lines) == list(range(10))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "body",
+    [[b'{"n": 1}\n', b"x" * 64], [b'{"n": 1}\n' + b"x" * 64 + b"\n"]],
+    ids=["partial-line", "complete-line"],
+)
+async def test_stream_ndjson_rejects_oversized_line(body):
+    async def chunks():
+        for chunk in body:
+            yield chunk
+
+    async def handle(index, line):
+        return {"index": index, "status": 200}
+
+    lines = [line async for line in stream_ndjson(chunks(), handle, 2, 32)]
+
+    results = sorted((json.loads(line) for line in lines), key=lambda r: r["index"])
+    assert [r["status"] for r in results] == [200, 413]
+
+
+@pytest.mark.asyncio
+async def test_stream_ndjson_reports_input_failure():
+    async def chunks():
+        yield b'{"n": 1}\n'
+        raise RuntimeError("connection reset")
+
+    async def handle(index, line):
+        return {"index": index, "status": 200}
+
+    lines = [line async for line in stream_ndjson(chunks(), handle, 2, 1024)]
+
+    results = sorted((json.loads(line) for line in lines), key=lambda r: r["index"])
+    assert [r["status"] for r in results] == [200, 500]
+    assert results[1]["index"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ndjson_response_turns_send_errors_into_client_disconnect():
+    async def body():
+        yield "{}\n"
+
+    async def send(message):
+        raise OSError("broken pipe")
+
+    with pytest.raises(ClientDisconnect):
+        await NDJSONResponse(body())({"type": "http"}, None, send)
@@ -0,0 +1,214 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from app.core import security
+from app.core.config import settings
+from app.core.keys import KeyRegistry, hash_key
+from app.main import app
+
+
+def _write_registry(path, *keys):
+    path.write_text(json.dumps({"keys": list(keys)}))
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    path = tmp_path / "keys.json"
+    _write_registry(
+        path,
+        {
+            "name": "detector",
+            "key_sha256": hash_key("detector-key"),
+            "allowed_endpoints": ["/language-detect"],
+            "max_text_chars": 20,
+        },
+        {
+            "name": "summarizer",
+            "key_sha256": hash_key("summarizer-key"),
+            "providers": ["gemini-1.5"],
+        },
+    )
+    registry = KeyRegistry(str(path))
+    monkeypatch.setattr(security, "key_registry", registry)
+    return registry
+
+
+@pytest.fixture
+def auth_client(monkeypatch):
+    monkeypatch.setattr(app, "dependency_overrides", {})
+    return TestClient(app)
+
+
+def test_unknown_key_is_rejected(auth_client, registry):
+    response = auth_client.post(
+        "/language-detect", json={"text": "Bonjour"}, headers={"x-api-key": "nope"}
+    )
+    assert response.status_code == 401
+
+
+def test_internal_api_key_remains_valid(auth_client, registry):
+    with patch("app.api.endpoints.language_detect.detect_language", return_value="fr"):
+        response = auth_client.post(
+            "/language-detect",
+            json={"text": "Bonjour"},
+            headers={"x-api-key": os.environ["INTERNAL_API_KEY"]},
+        )
+    assert response.status_code == 200
+
+
+def test_key_policy_limits_endpoints_and_text_size(auth_client, registry):
+    headers = {"x-api-key": "detector-key"}
+    with patch("app.api.endpoints.language_detect.detect_language", return_value="fr"):
+        allowed = auth_client.post(
+            "/language-detect", json={"text": "Bonjour"}, headers=headers
+        )
+        too_long = auth_client.post(
+            "/language-detect", json={"text": "Bonjour " * 10}, headers=headers
+        )
+    forbidden = auth_client.post("/summarize", json={"text": "Hi"}, headers=headers)
+
+    assert allowed.status_code == 200
+    assert too_long.status_code == 413
+    assert forbidden.status_code == 403
+
+
+def test_key_policy_selects_provider_chain(auth_client, registry):
+    async def fake_summarize(text, length, variant):
+        return f"summary from {variant}"
+
+    with patch("app.services.llm.gemini.summarize", new=fake_summarize):
+        response = auth_client.post(
+            "/summarize",
+            json={"text": "Some text"},
+            headers={"x-api-key": "summarizer-key"},
+        )
+
+    assert response.json() == {"summary": "summary from 1.5", "provider": "gemini-1.5"}
+
+
+@pytest.fixture
+def watched_registry(tmp_path):
+    path = tmp_path / "keys.json"
+    _write_registry(path)
+    registry = KeyRegistry(str(path))
+    registry.watch(0.01)
+    yield registry, path
+    registry.stop()
+
+
+def test_registry_hot_reloads_changed_file(watched_registry):
+    registry, path = watched_registry
+    assert registry.lookup("new-key") is None
+
+    _write_registry(path, {"name": "new", "key_sha256": hash_key("new-key")})
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+
+    deadline = time.monotonic() + 2
+    while registry.lookup("new-key") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert registry.lookup("new-key").name == "new"
+
+
+def test_bulk_items_respect_allowed_endpoints(auth_client, tmp_path, monkeypatch):
+    path = tmp_path / "keys.json"
+    _write_registry(
+        path,
+        {
+            "name": "bulk-detector",
+            "key_sha256": hash_key("bulk-key"),
+            "allowed_endpoints": ["/language-detect", "/bulk"],
+        },
+    )
+    monkeypatch.setattr(security, "key_registry", KeyRegistry(str(path)))
+
+    items = [
+        {"op": "summarize", "text": "Some text"},
+        {"op": "language-detect", "text": "Bonjour"},
+    ]
+    with patch("app.api.endpoints.bulk.detect_language", return_value="fr"):
+        response = auth_client.post(
+            "/bulk",
+            content="\n".join(json.dumps(item) for item in items) + "\n",
+            headers={"x-api-key": "bulk-key"},
+        )
+
+    results = sorted(
+        (json.loads(line) for line in response.text.splitlines()),
+        key=lambda r: r["index"],
+    )
+    assert [r["status"] for r in results] == [403, 200]
+
+
+def test_registry_rejects_unknown_providers(tmp_path):
+    path = tmp_path / "keys.json"
+    _write_registry(
+        path,
+        {"name": "typo", "key_sha256": hash_key("k"), "providers": ["gemni-2.5"]},
+    )
+
+    with pytest.raises(ValueError, match="Unknown providers"):
+        KeyRegistry(str(path))
+
+
+def test_unconfigured_provider_policy_fails_clearly(auth_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", None)
+    path = tmp_path / "keys.json"
+    _write_registry(
+        path,
+        {
+            "name": "openai-only",
+            "key_sha256": hash_key("openai-key"),
+            "providers": ["openai-4o-mini"],
+        },
+    )
+    monkeypatch.setattr(security, "key_registry", KeyRegistry(str(path)))
+
+    response = auth_client.post(
+        "/summarize", json={"text": "Some text"}, headers={"x-api-key": "openai-key"}
+    )
+
+    assert response.status_code == 503
+    assert "openai-4o-mini" in response.json()["detail"]
+
+
+def test_registry_watcher_stops(watched_registry):
+    registry, _ = watched_registry
+    watcher = registry._watcher
+
+    registry.stop()
+
+    assert not watcher.is_alive()
+
+
+def test_registry_can_revoke_internal_api_key(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"keys": [], "allow_internal_api_key": False}))
+
+    registry = KeyRegistry(str(path))
+
+    assert registry.lookup(os.environ["INTERNAL_API_KEY"]) is None
+
+
+def test_reload_swaps_keys_and_internal_api_key_together(tmp_path):
+    path = tmp_path / "keys.json"
+    _write_registry(path)
+    registry = KeyRegistry(str(path))
+    before = registry._snapshot
+
+    path.write_text(
+        json.dumps(
+            {
+                "keys": [{"name": "new", "key_sha256": hash_key("new-key")}],
+                "allow_internal_api_key": False,
+            }
+        )
+    )
+    registry.load()
+
+    assert before.index == {} and before.fallback is not None
+    assert registry.lookup("new-key").name == "new"
+    assert registry.lookup(os.environ["INTERNAL_API_KEY"]) is None
@@ -1,5 +1,13 @@
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
+
+import httpx
+import openai as openai_sdk
 import pytest
 from fastapi import HTTPException
+from google.api_core import exceptions as google_exceptions
+from google.generativeai.types import StopCandidateException
+from app.services.llm import gemini, openai
+from app.services.llm.errors import ErrorCategory, ProviderError
 from app.services.llm_provider import fallback_chain
 
 
@@ -43,3 +51,183 @@ async def test_fallback_chain_all_fail():
         await fallback_chain([("fail1", fail1), ("fail2", fail2)])
 
     assert exc_info.value.status_code == 503
+
+
+@pytest.fixture
+def no_sleep():
+    with patch("app.services.llm_provider.asyncio.sleep", new=AsyncMock()) as sleep:
+        yield sleep
+
+
+@pytest.mark.asyncio
+async def test_fallback_chain_stops_on_request_fatal_error():
+    second = AsyncMock(return_value="ok2")
+
+    async def blocked():
+        raise ProviderError("blocked", ErrorCategory.FATAL_REQUEST, status_code=422)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await fallback_chain([("gemini-2.5", blocked), ("gemini-1.5", second)])
+
+    assert exc_info.value.status_code == 422
+    assert exc_info.value.detail == "blocked"
+    second.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fallback_chain_retries_rate_limited_model(no_sleep):
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ProviderError(
+                "slow down",
+                ErrorCategory.RATE_LIMITED,
+                status_code=429,
+                retry_after=0.2,
+            )
+        return "ok"
+
+    result, provider = await fallback_chain([("gemini-2.5", flaky)])
+
+    assert (result, provider) == ("ok", "gemini-2.5")
+    assert no_sleep.await_args.args[0] >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_fallback_chain_skips_models_of_failed_provider():
+    gemini_15 = AsyncMock(return_value="unused")
+
+    async def bad_key():
+        raise ProviderError("bad key", ErrorCategory.FATAL_PROVIDER)
+
+    async def openai_ok():
+        return "ok"
+
+    result, provider = await fallback_chain(
+        [
+            ("gemini-2.5", bad_key),
+            ("gemini-1.5", gemini_15),
+            ("openai-4o-mini", openai_ok),
+        ]
+    )
+
+    assert provider == "openai-4o-mini"
+    gemini_15.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fallback_chain_surfaces_rate_limit_when_exhausted(no_sleep):
+    async def limited():
+        raise ProviderError(
+            "slow down", ErrorCategory.RATE_LIMITED, status_code=429, retry_after=30
+        )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await fallback_chain([("gemini-2.5", limited)])
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "30"}
+    no_sleep.assert_not_called()
+
+
+def test_openai_rate_limit_is_classified_with_retry_after():
+    response = httpx.Response(
+        429,
+        headers={"retry-after-ms": "200"},
+        request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"),
+    )
+    error = openai_sdk.RateLimitError("Rate limit", response=response, body=None)
+
+    classified = openai.classify_error(error)
+
+    assert classified.category is ErrorCategory.RATE_LIMITED
+    assert classified.retry_after == 0.2
+
+
+def test_gemini_invalid_argument_is_request_fatal():
+    classified = gemini.classify_error(google_exceptions.InvalidArgument("bad input"))
+
+    assert classified.category is ErrorCategory.FATAL_REQUEST
+    assert classified.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_fallback_chain_moves_past_missing_model():
+    async def missing():
+        raise gemini.classify_error(google_exceptions.NotFound("model not found"))
+
+    async def gemini_15():
+        return "ok"
+
+    result, provider = await fallback_chain(
+        [("gemini-2.5", missing), ("gemini-1.5", gemini_15)]
+    )
+
+    assert provider == "gemini-1.5"
+
+
+def _gemini_response(finish_reason):
+    response = Mock()
+    type(response).text = PropertyMock(side_effect=ValueError("no text"))
+    response.prompt_feedback.block_reason = 0
+    response.candidates = [Mock()]
+    response.candidates[0].finish_reason.name = finish_reason
+    return response
+
+
+@pytest.mark.asyncio
+async def test_gemini_safety_block_is_request_fatal():
+    model = Mock(model_name="models/test")
+    model.generate_content.return_value = _gemini_response(finish_reason="SAFETY")
+
+    with pytest.raises(ProviderError) as exc_info:
+        await gemini._generate(model, "prompt")
+
+    assert exc_info.value.category is ErrorCategory.FATAL_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_gemini_max_tokens_stop_is_not_request_fatal():
+    model = Mock(model_name="models/test")
+    model.generate_content.return_value = _gemini_response(finish_reason="MAX_TOKENS")
+
+    with pytest.raises(ValueError):
+        await gemini._generate(model, "prompt")
+
+
+@pytest.mark.asyncio
+async def test_openai_rate_limit_is_retried_through_client(no_sleep):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    limited = openai_sdk.RateLimitError(
+        "Rate limit",
+        response=httpx.Response(429, headers={"retry-after": "1"}, request=request),
+        body=None,
+    )
+    completion = Mock(choices=[Mock(message=Mock(content=" Summary "))])
+    client = Mock()
+    client.chat.completions.create = AsyncMock(side_effect=[limited, completion])
+
+    with patch("app.services.llm.openai._get_client", return_value=client):
+        result, provider = await fallback_chain(
+            [("openai-4o-mini", lambda: openai.summarize("text", "short", "4o-mini"))]
+        )
+
+    assert (result, provider) == ("Summary", "openai-4o-mini")
+    assert client.chat.completions.create.await_count == 2
+    assert client.chat.completions.create.await_args.kwargs["model"] == "gpt-4o-mini"
+    assert no_sleep.await_args.args[0] >= 1
+
+
+def test_gemini_stop_candidate_is_request_fatal_only_for_safety():
+    safety = Mock()
+    safety.finish_reason.name = "SAFETY"
+    recitation = Mock()
+    recitation.finish_reason.name = "RECITATION"
+
+    classified = gemini.classify_error(StopCandidateException(safety))
+
+    assert classified.category is ErrorCategory.FATAL_REQUEST
+    assert gemini.classify_error(StopCandidateException(recitation)) is None
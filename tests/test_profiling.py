@@ -0,0 +1,86 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from app.core import profiling
+from app.core.config import settings
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def profiling_settings(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "profile-me")
+    monkeypatch.setattr(settings, "PROFILE_INTERVAL_MS", 1.0)
+    profiling.captured.clear()
+    yield
+    profiling.captured.clear()
+
+
+async def _blocking_summarize(text, length, variant):
+    time.sleep(0.05)
+    return "Mock summary"
+
+
+def test_profile_header_captures_stages_and_stacks(client):
+    with patch("app.services.llm.gemini.summarize", new=_blocking_summarize):
+        response = client.post(
+            "/summarize",
+            json={"text": "Profile this request."},
+            headers={"x-profile": "profile-me"},
+        )
+    assert response.status_code == 200
+
+    token = {"x-profile": "profile-me"}
+    stages = client.get("/internal/profiles/stages", headers=token).json()["profiles"]
+    assert len(stages) == 1
+    assert stages[0]["path"] == "/summarize"
+    assert "provider:gemini-2.5" in [s["name"] for s in stages[0]["stages"]]
+
+    folded = client.get("/internal/profiles", headers=token).text
+    assert folded.startswith("POST /summarize;")
+    assert "app.services.llm_provider:fallback_chain;" in folded
+    assert ";test_profiling:_blocking_summarize " in folded
+
+
+def test_wrong_profile_token_is_ignored(client):
+    response = client.post(
+        "/language-detect/",
+        json={"text": ""},
+        headers={"x-profile": "guess"},
+    )
+    assert response.status_code == 422
+    assert len(profiling.captured) == 0
+
+
+def test_profile_dumps_require_profile_token():
+    client = TestClient(app)
+    api_key = {"x-api-key": os.environ["INTERNAL_API_KEY"]}
+
+    assert client.get("/internal/profiles", headers=api_key).status_code == 403
+    assert client.get("/internal/profiles/stages").status_code == 403
+    assert (
+        client.get(
+            "/internal/profiles", headers={"x-profile": "profile-me"}
+        ).status_code
+        == 200
+    )
+
+
+def test_stage_is_noop_without_profile():
+    with profiling.stage("anything") as s:
+        pass
+    assert s is profiling._NULL_STAGE
+
+
+@pytest.mark.asyncio
+async def test_profile_stages_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_MAX_STAGES", 2)
+    profile = profiling.RequestProfile("POST", "/bulk")
+
+    for i in range(5):
+        profile.add_stage(f"provider:{i}", 0.0, 1.0)
+
+    assert len(profile.stages) == 2
+    assert profile.to_dict()["dropped_stages"] == 3
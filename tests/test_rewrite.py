@@ -1,4 +1,11 @@
-from unittest.mock import patch
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import HTTPException
+from app.core.config import settings
+from app.services.incremental import rewrite_incremental
 
 
 def test_rewrite_endpoint(client):
@@ -32,3 +39,77 @@ def test_rewrite_missing_text(client):
         json={"style": "simple"},
     )
     assert response.status_code == 422
+
+
+def test_rewrite_incremental_reuses_unchanged_paragraphs(client):
+    calls = []
+
+    async def fake_rewrite(text, style):
+        calls.append(text)
+        return {"rewritten": text.upper(), "provider": "mock"}
+
+    first = "First paragraph.\n\nSecond paragraph.\n"
+    edited = "First paragraph.\n\nSecond paragraph, edited.\n"
+    with patch("app.services.incremental.rewrite", new=fake_rewrite):
+        response = client.post(
+            "/rewrite/", json={"text": first, "style": "formal", "incremental": True}
+        )
+        assert response.json() == {
+            "rewritten": "FIRST PARAGRAPH.\n\nSECOND PARAGRAPH.\n",
+            "provider": "mock",
+            "segments": 2,
+            "reused": 0,
+        }
+
+        response = client.post(
+            "/rewrite/", json={"text": edited, "style": "formal", "incremental": True}
+        )
+        json_data = response.json()
+        assert (
+            json_data["rewritten"] == "FIRST PARAGRAPH.\n\nSECOND PARAGRAPH, EDITED.\n"
+        )
+        assert json_data["reused"] == 1
+
+    assert calls == [
+        "First paragraph.",
+        "Second paragraph.",
+        "Second paragraph, edited.",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rewrite_incremental_cancels_remaining_segments_on_failure():
+    cancelled = asyncio.Event()
+
+    async def fake_rewrite(text, style):
+        if text == "Bad paragraph.":
+            raise HTTPException(status_code=422, detail="blocked")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with patch("app.services.incremental.rewrite", new=fake_rewrite):
+        with pytest.raises(HTTPException):
+            await rewrite_incremental("Slow paragraph.\n\nBad paragraph.", "simple")
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_rewrite_incremental_runs_segments_concurrently(monkeypatch):
+    monkeypatch.setattr(settings, "REWRITE_SEGMENT_CONCURRENCY", 4)
+
+    def slow_generate(prompt):
+        time.sleep(0.2)
+        return Mock(text="Rewritten.")
+
+    model = Mock(model_name="models/test", generate_content=slow_generate)
+    text = "\n\n".join(f"Concurrent paragraph {i}." for i in range(4))
+    with patch("app.services.llm.gemini.get_model", return_value=model):
+        start = time.monotonic()
+        result = await rewrite_incremental(text, "simple")
+        elapsed = time.monotonic() - start
+
+    assert result["segments"] == 4 and result["reused"] == 0
+    assert elapsed < 0.5
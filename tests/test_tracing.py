@@ -0,0 +1,120 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from app.core import tracing
+from app.core.config import settings
+from app.main import app
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 0.0)
+    exporter = tracing.InMemorySpanExporter()
+    tracing.set_exporter(exporter)
+    yield exporter
+    tracing.set_exporter(None)
+
+
+async def _summarize(text, length, variant):
+    return "Mock summary"
+
+
+def test_incoming_traceparent_is_continued(client, exporter):
+    with patch("app.services.llm.gemini.summarize", new=_summarize):
+        response = client.post(
+            "/summarize",
+            json={"text": "Trace this request."},
+            headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+        )
+    assert response.status_code == 200
+    assert response.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+
+    spans = {span.name: span for span in exporter.spans}
+    root = spans["POST /summarize"]
+    chain = spans["fallback_chain"]
+    attempt = spans["provider:gemini-2.5"]
+    assert {span.trace.trace_id for span in exporter.spans} == {TRACE_ID}
+    assert root.parent_id == PARENT_ID
+    assert chain.parent_id == root.span_id
+    assert attempt.parent_id == chain.span_id
+    assert attempt.attributes == {"attempt": 0}
+
+
+def test_unsampled_fast_trace_is_dropped(client, exporter):
+    with patch("app.services.llm.gemini.summarize", new=_summarize):
+        response = client.post("/summarize", json={"text": "Not sampled."})
+    assert response.status_code == 200
+    assert exporter.spans == []
+
+
+def test_failed_trace_is_always_kept(client, exporter):
+    async def fail(text, length, variant):
+        raise RuntimeError("provider down")
+
+    with patch("app.services.llm.gemini.summarize", new=fail):
+        response = client.post("/summarize", json={"text": "Will fail."})
+    assert response.status_code == 503
+
+    errors = [span.to_otlp()["status"] for span in exporter.spans if span.error]
+    assert {"code": 2, "message": "RuntimeError: provider down"} in errors
+
+
+def test_parse_traceparent_rejects_malformed_headers():
+    assert tracing.parse_traceparent("garbage") is None
+    assert tracing.parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (
+        TRACE_ID,
+        PARENT_ID,
+        False,
+    )
+
+
+def test_spans_per_trace_are_capped(client, exporter, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_MAX_SPANS", 1)
+    with patch("app.services.llm.gemini.summarize", new=_summarize):
+        client.post(
+            "/summarize",
+            json={"text": "Capped."},
+            headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+        )
+
+    root = exporter.spans[-1]
+    assert len(exporter.spans) == 2
+    assert root.attributes["tracing.dropped_spans"] == 1
+
+
+def test_file_exporter_writes_from_background_thread(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+    exporter = tracing.FileSpanExporter(str(tmp_path / "traces.jsonl"))
+    tracing.set_exporter(exporter)
+    try:
+        client.post("/language-detect", json={"text": ""})
+    finally:
+        tracing.set_exporter(None)
+        exporter.shutdown()
+
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    assert len(lines) == 1
+    resource_spans = json.loads(lines[0])["resourceSpans"][0]
+    (root,) = resource_spans["scopeSpans"][0]["spans"]
+    assert root["kind"] == tracing.SPAN_KIND_SERVER
+    assert {"key": "http.status_code", "value": {"intValue": "422"}} in root[
+        "attributes"
+    ]
+
+
+def test_exporter_is_shut_down_with_the_app():
+    exporter = Mock(spec=tracing.FileSpanExporter)
+    tracing.set_exporter(exporter)
+    try:
+        with TestClient(app):
+            exporter.shutdown.assert_not_called()
+    finally:
+        tracing.set_exporter(None)
+
+    exporter.shutdown.assert_called_once_with()